@@ -1,94 +1,191 @@
+import asyncio
+import aiohttp
 import requests
 import configparser
+import ijson
 import logging
-from datetime import datetime
+import orjson
+from datetime import datetime, timedelta
+from requests.adapters import HTTPAdapter
+from requests_cache import CachedSession
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential
+from urllib3.exceptions import HTTPError as Urllib3Error
+from urllib3.util.retry import Retry
+
+HEADERS = {"User-Agent": "HealthcareETL/1.0"}
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+def _is_transient(exc):
+    if isinstance(exc, aiohttp.ClientResponseError):
+        return exc.status in RETRY_STATUSES
+    return isinstance(exc, (aiohttp.ClientError, asyncio.TimeoutError))
+
 class APIClient:
     def __init__(self):
         config = configparser.ConfigParser()
         config.read('config.ini')
         self.base_url = config['api']['url']
+        self.vaccine_url = config['api']['vaccine_url']
         logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+        self.session = CachedSession(cache_name="covid_api_cache", backend="sqlite", expire_after=3600,
+                                     allowable_methods=("GET",), cache_control=True)
+        self.session.headers.update(HEADERS)
+        adapter = HTTPAdapter(pool_connections=20, pool_maxsize=20,
+                              max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=RETRY_STATUSES))
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._bulk_results = {}
+
     def fetch_data(self, country, start_date, end_date):
         url = f"{self.base_url}/{country}?lastdays=all"
         try:
             logging.info(f" Fetching historical data for {country} from API...")
-            response = requests.get(url)
+            response = self.session.get(url, timeout=(5, 30))
             response.raise_for_status()
-            data = response.json()
-
-            if 'timeline' not in data:
-                logging.warning(f" No timeline data found for {country}.")
-                return []
-
-            cases = data['timeline'].get('cases', {})
-            deaths = data['timeline'].get('deaths', {})
-            recovered = data['timeline'].get('recovered', {})
-            start = datetime.strptime(start_date, "%Y-%m-%d")
-            end = datetime.strptime(end_date, "%Y-%m-%d")
-            filtered_data = []
-            for date_str in cases:
-                try:
-                    date_obj = datetime.strptime(date_str, "%m/%d/%y")
-                except ValueError:
-                    logging.warning(f"Invalid date format: {date_str}")
-                    continue
-
-                if start <= date_obj <= end:
-                    filtered_data.append({
-                        "date": date_obj.strftime("%Y-%m-%d"),
-                        "country": country,
-                        "cases": cases.get(date_str, 0),
-                        "deaths": deaths.get(date_str, 0),
-                        "recovered": recovered.get(date_str, 0)
-                    })
-
+            filtered_data = self._filter_cases(country, orjson.loads(response.content), start_date, end_date)
             logging.info(f" Retrieved {len(filtered_data)} records for {country} between {start_date} and {end_date}.")
             return filtered_data
 
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
             logging.error(f" Error fetching data from API: {e}")
             return []
         
-    def fetch_vaccine_data(self, country, start_date, end_date):
-        config = configparser.ConfigParser()
-        config.read('config.ini')
-        vaccine_url = config['api']['vaccine_url']
+    def fetch_all(self, start_date, end_date):
+        url = f"{self.base_url}?lastdays=all"
+        if (start_date, end_date) in self._bulk_results:
+            return self._bulk_results[(start_date, end_date)]
+        try:
+            logging.info(" Fetching historical data for all countries from API...")
+            # The bulk endpoint returns one entry per province, so sum them per country and date
+            totals = {}
+            # Every province shares the same window, so build its "m/d/yy" keys once
+            window = self._date_keys(start_date, end_date)
+            # requests-cache reads the whole body into memory before returning, even with stream=True,
+            # so bypass it here and keep the (much smaller) filtered result instead
+            with self.session.cache_disabled(), self.session.get(url, timeout=(5, 30), stream=True) as response:
+                response.raise_for_status()
+                response.raw.decode_content = True
+                # Stream one province entry at a time rather than materializing the whole payload
+                for entry in ijson.items(response.raw, "item"):
+                    for record in self._filter_cases(entry["country"], entry, start_date, end_date, window):
+                        key = (record["country"], record["date"])
+                        if key in totals:
+                            for metric in ("cases", "deaths", "recovered"):
+                                totals[key][metric] += record[metric]
+                        else:
+                            totals[key] = record
+
+            filtered_data = list(totals.values())
+            self._bulk_results[(start_date, end_date)] = filtered_data
+            logging.info(f" Retrieved {len(filtered_data)} records for all countries between {start_date} and {end_date}.")
+            return filtered_data
+
+        # ijson reads response.raw directly, so mid-download failures arrive as urllib3 errors, not requests ones
+        except (requests.exceptions.RequestException, Urllib3Error, ijson.JSONError) as e:
+            logging.error(f" Error fetching data from API: {e}")
+            return []
 
-        url = f"{vaccine_url}/{country}?lastdays=all"
+    def fetch_vaccine_data(self, country, start_date, end_date):
+        url = f"{self.vaccine_url}/{country}?lastdays=all"
         try:
             logging.info(f" Fetching vaccination data for {country} from API...")
-            response = requests.get(url)
+            response = self.session.get(url, timeout=(5, 30))
             response.raise_for_status()
-            data = response.json()
-
-            if 'timeline' not in data:
-                logging.warning(f" No vaccination timeline data found for {country}.")
-                return []
-
-            vaccinations = data['timeline']
-            start = datetime.strptime(start_date, "%Y-%m-%d")
-            end = datetime.strptime(end_date, "%Y-%m-%d")
-
-            filtered_data = []
-            for date_str, value in vaccinations.items():
-                try:
-                    date_obj = datetime.strptime(date_str, "%m/%d/%y")
-                except ValueError:
-                    logging.warning(f"Invalid date format: {date_str}")
-                    continue
-
-                if start <= date_obj <= end:
-                    filtered_data.append((
-                        country,
-                        date_obj.strftime("%Y-%m-%d"),
-                        int(value)
-                    ))
-
+            filtered_data = self._filter_vaccinations(country, orjson.loads(response.content), start_date, end_date)
             logging.info(f" Retrieved {len(filtered_data)} vaccination records for {country}")
             return filtered_data
 
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
             logging.error(f" Error fetching vaccination data: {e}")
             return []
 
+    async def fetch_many(self, countries, start_date, end_date):
+        return await self._fetch_many(self.base_url, countries, start_date, end_date,
+                                      self._filter_cases, "historical")
+
+    async def fetch_many_vaccine(self, countries, start_date, end_date):
+        return await self._fetch_many(self.vaccine_url, countries, start_date, end_date,
+                                      self._filter_vaccinations, "vaccination")
+
+    async def _fetch_many(self, base_url, countries, start_date, end_date, parse, label):
+        logging.info(f" Fetching {label} data for {len(countries)} countries from API...")
+        timeout = aiohttp.ClientTimeout(sock_connect=5, sock_read=30)
+        connector = aiohttp.TCPConnector(limit=20)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout, headers=HEADERS) as session:
+            tasks = [self._get_json(session, f"{base_url}/{country}?lastdays=all") for country in countries]
+            responses = await asyncio.gather(*tasks, return_exceptions=True)
+
+        filtered_data = []
+        for country, data in zip(countries, responses):
+            if isinstance(data, Exception):
+                logging.error(f" Error fetching {label} data for {country}: {data}")
+                continue
+            filtered_data.extend(parse(country, data, start_date, end_date))
+
+        logging.info(f" Retrieved {len(filtered_data)} {label} records for {len(countries)} countries")
+        return filtered_data
+
+    @staticmethod
+    @retry(retry=retry_if_exception(_is_transient), stop=stop_after_attempt(3),
+           wait=wait_exponential(multiplier=0.3, max=5), reraise=True)
+    async def _get_json(session, url):
+        async with session.get(url) as response:
+            response.raise_for_status()
+            return orjson.loads(await response.read())
+
+    def _filter_cases(self, country, data, start_date, end_date, window=None):
+        if 'timeline' not in data:
+            logging.warning(f" No timeline data found for {country}.")
+            return []
+
+        cases = data['timeline'].get('cases', {})
+        deaths = data['timeline'].get('deaths', {})
+        recovered = data['timeline'].get('recovered', {})
+        keys, dates = self._select_dates(cases, start_date, end_date, window)
+        filtered_data = []
+        for key, date in zip(keys, dates):
+            filtered_data.append({
+                "date": date,
+                "country": country,
+                "cases": cases[key],
+                "deaths": deaths.get(key, 0),
+                "recovered": recovered.get(key, 0)
+            })
+        return filtered_data
+
+    def _filter_vaccinations(self, country, data, start_date, end_date):
+        if 'timeline' not in data:
+            logging.warning(f" No vaccination timeline data found for {country}.")
+            return []
+
+        vaccinations = data['timeline']
+        keys, dates = self._select_dates(vaccinations, start_date, end_date)
+        return [(country, date, int(vaccinations[key])) for key, date in zip(keys, dates)]
+
+    def _date_keys(self, start_date, end_date):
+        # Build the API's "m/d/yy" keys for the requested window instead of parsing every timeline key
+        day = datetime.strptime(start_date, "%Y-%m-%d").date()
+        end = datetime.strptime(end_date, "%Y-%m-%d").date()
+        window = []
+        while day <= end:
+            window.append((f"{day.month}/{day.day}/{day:%y}", day.isoformat()))
+            day += timedelta(days=1)
+        return window
+
+    def _select_dates(self, timeline, start_date, end_date, window=None):
+        if window is None:
+            window = self._date_keys(start_date, end_date)
+        keys, dates = [], []
+        for key, date in window:
+            if key in timeline:
+                keys.append(key)
+                dates.append(date)
+        return keys, dates
+
+    def clear_cache(self):
+        self.session.cache.clear()
+        self._bulk_results.clear()
+
+    def close(self):
+        self.session.close()
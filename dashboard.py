@@ -14,38 +14,98 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import configparser
-import mysql.connector
-from mysql.connector import Error
-from datetime import datetime
+import connectorx as cx
+import os
+from datetime import date, datetime
+from urllib.parse import quote
 
 st.set_page_config(page_title="🌍 Global Healthcare Data ETL & Analysis CLI", layout="wide", initial_sidebar_state="expanded")
 
 def read_db_config(path="config.ini"):
     cfg = configparser.ConfigParser()
     cfg.read(path)
-    return {
+    db = {
         "host": cfg["mysql"].get("host", "localhost"),
         "user": cfg["mysql"].get("user", "root"),
         "password": cfg["mysql"].get("password", ""),
         "database": cfg["mysql"].get("database", "healthcare_db"),
         "port": cfg["mysql"].getint("port", 3306),
     }
+    # Same MYSQL_* overrides as mysql_handler, so the CLI and dashboard always read the same database
+    for key in ("host", "user", "password", "database"):
+        db[key] = os.environ.get(f"MYSQL_{key.upper()}", db[key])
+    return db
 
-@st.cache_data(ttl=300)
-def load_table(cfg_path, table_name):
-    cfg = read_db_config(cfg_path)
+def db_uri(cfg):
+    return (f"mysql://{quote(cfg['user'], safe='')}:{quote(cfg['password'], safe='')}"
+            f"@{cfg['host']}:{cfg['port']}/{cfg['database']}")
+
+def sql_literal(value):
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    if isinstance(value, (date, datetime)):
+        return f"'{value:%Y-%m-%d}'"
+    return "'" + str(value).replace("\\", "\\\\").replace("'", "''") + "'"
+
+def run_query(cfg_path, query, params=None, columns=None):
+    # connectorx has no parameter binding, so values are inlined as escaped literals
+    if params:
+        query = query % tuple(sql_literal(p) for p in params)
     try:
-        conn = mysql.connector.connect(**cfg)
-        df = pd.read_sql(f"SELECT * FROM {table_name}", conn)
-        conn.close()
-    except Error as e:
+        return cx.read_sql(db_uri(read_db_config(cfg_path)), query, return_type="pandas")
+    except RuntimeError as e:
         st.error(f"Database error: {e}")
-        return pd.DataFrame()
-    if "date" in df.columns:
-        df["date"] = pd.to_datetime(df["date"], errors="coerce")
-    df.columns = [c.strip() for c in df.columns]
+        # Keep the expected columns so callers' column lookups and groupbys still work on failure
+        return pd.DataFrame(columns=columns)
+
+METRICS = {
+    "covid_stats": ["cases", "deaths", "recovered"],
+    "vaccination_data": ["vaccinations"],
+}
+TABLE_COLS = {table: ", ".join(["country", "date"] + metrics) for table, metrics in METRICS.items()}
+
+def compact_dtypes(df):
+    if "country" in df.columns:
+        df["country"] = df["country"].astype("category")
+    for col in ("cases", "deaths", "recovered", "vaccinations"):
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], downcast="unsigned")
     return df
 
+@st.cache_data(ttl=300)
+def load_bounds(cfg_path, table_name):
+    df = run_query(cfg_path, f"SELECT country, MIN(date) AS first_date, MAX(date) AS last_date FROM {table_name} GROUP BY country",
+                   columns=["country", "first_date", "last_date"])
+    if df.empty:
+        return [], None, None
+    return sorted(df["country"].dropna()), pd.to_datetime(df["first_date"]).min().date(), pd.to_datetime(df["last_date"]).max().date()
+
+@st.cache_data(ttl=300)
+def load_filtered(cfg_path, table_name, start, end, country=None):
+    query = f"SELECT {TABLE_COLS[table_name]} FROM {table_name} WHERE date BETWEEN %s AND %s"
+    params = [start, end]
+    if country is not None:
+        query += " AND country = %s"
+        params.append(country)
+    query += " ORDER BY date"
+    df = run_query(cfg_path, query, tuple(params), columns=["country", "date"] + METRICS[table_name])
+    # connectorx already returns DATE columns as datetime64, so only convert when it did not
+    if "date" in df.columns and not pd.api.types.is_datetime64_any_dtype(df["date"]):
+        df["date"] = pd.to_datetime(df["date"], format="%Y-%m-%d", errors="coerce", cache=True)
+    return compact_dtypes(df)
+
+@st.cache_data(ttl=300)
+def load_top_n(cfg_path, table_name, metric, start, end, n):
+    query = f"""
+        SELECT country, CAST(COALESCE(SUM({metric}), 0) AS SIGNED) AS {metric}
+        FROM {table_name}
+        WHERE date BETWEEN %s AND %s
+        GROUP BY country
+        ORDER BY 2 DESC
+        LIMIT %s
+    """
+    return run_query(cfg_path, query, (start, end, n), columns=["country", metric])
+
 @st.cache_data
 def load_latlon(csv_path="data/world_latitude_longitude.csv"):
     try:
@@ -68,6 +128,27 @@ def load_latlon(csv_path="data/world_latitude_longitude.csv"):
 def summarize_kpis(df, metric_cols):
     return {col: int(df[col].sum()) for col in metric_cols if col in df.columns}
 
+@st.cache_data(ttl=600, show_spinner=False)
+def compute_kpis(cfg_path, table_name, start, end, country=None):
+    return summarize_kpis(load_filtered(cfg_path, table_name, start, end, country), METRICS[table_name])
+
+@st.cache_data(ttl=600, show_spinner=False)
+def compute_snapshot(cfg_path, table_name, metric, day):
+    return load_filtered(cfg_path, table_name, day, day).groupby("country", as_index=False, observed=True)[metric].sum()
+
+@st.cache_data(ttl=600, show_spinner=False)
+def country_summary(cfg_path, table_name):
+    metrics = METRICS[table_name]
+    # SUM() yields DECIMAL; casting in SQL hands back BIGINT columns that load straight into int64
+    sums = ", ".join(f"CAST(COALESCE(SUM({m}), 0) AS SIGNED) AS {m}" for m in metrics)
+    return run_query(cfg_path, f"SELECT country, {sums} FROM {table_name} GROUP BY country", columns=["country"] + metrics)
+
+@st.cache_data(ttl=600, show_spinner=False)
+def compute_recovery_rates(cfg_path):
+    recovery = country_summary(cfg_path, "covid_stats")[["country", "recovered", "cases"]]
+    recovery = recovery.assign(rate=(recovery["recovered"] / recovery["cases"]) * 100)
+    return recovery[recovery["rate"] > 50]
+
 st.markdown("""
 <style>
     /* KPI Cards */
@@ -119,35 +200,33 @@ cfg_path = st.sidebar.text_input("Config File Path", value="config.ini", help="P
 data_choice = st.sidebar.radio("Select Data to Explore", ["COVID Stats", "Vaccination Data"], help="Toggle between COVID cases data and vaccination data")
 refresh = st.sidebar.button("🔄 Reload Data")
 
+table_name = "covid_stats" if data_choice == "COVID Stats" else "vaccination_data"
+metric_options = METRICS[table_name]
+
 with st.spinner(f"Loading {data_choice} data..."):
-    df = load_table(cfg_path, "covid_stats" if data_choice == "COVID Stats" else "vaccination_data")
-    metric_options = ["cases", "deaths", "recovered"] if data_choice == "COVID Stats" else ["vaccinations"]
+    country_list, min_date, max_date = load_bounds(cfg_path, table_name)
 
-if df.empty:
+if not country_list:
     st.warning(f"No data found in '{data_choice}' table.")
     st.stop()
 
 latlon_df = load_latlon()
 
-country_list = sorted(df["country"].dropna().unique())
 selected_country = st.sidebar.selectbox("Select Country", ["All"] + country_list, index=0, help="Filter data by a specific country or view all")
-min_date, max_date = df["date"].min().date(), df["date"].max().date()
 date_range = st.sidebar.date_input("Select Date Range", value=[min_date, max_date], min_value=min_date, max_value=max_date, help="Filter data by date range")
 metric = st.sidebar.selectbox("Choose Metric", options=metric_options, help="Select metric to analyze")
 top_n = st.sidebar.slider("Top N Countries to Display", 3, 30, 7, help="Number of top countries to show in bar chart and map")
 
-filtered = df.copy()
-if selected_country != "All":
-    filtered = filtered[filtered["country"] == selected_country]
-if len(date_range) == 2:
-    start_dt, end_dt = pd.to_datetime(date_range[0]), pd.to_datetime(date_range[1])
-    filtered = filtered[(filtered["date"] >= start_dt) & (filtered["date"] <= end_dt)]
+start_date, end_date = (date_range[0], date_range[1]) if len(date_range) == 2 else (min_date, max_date)
+with st.spinner(f"Loading {data_choice} data..."):
+    country = None if selected_country == "All" else selected_country
+    filtered = load_filtered(cfg_path, table_name, start_date, end_date, country)
 
 tabs = st.tabs(["📊 Overview", "📈 Top N & Map", "🧮 Analytics", "📋 Raw Data"])
 
 with tabs[0]:
     st.header("Overview")
-    kpis = summarize_kpis(filtered, metric_options)
+    kpis = compute_kpis(cfg_path, table_name, start_date, end_date, country)
     cols = st.columns(len(kpis))
     for i, (label, value) in enumerate(kpis.items()):
         with cols[i]:
@@ -160,7 +239,7 @@ with tabs[0]:
     st.markdown(f"**Records shown:** {len(filtered):,}")
 
     if metric in filtered.columns:
-        fig = px.line(filtered.sort_values("date"), x="date", y=metric,
+        fig = px.line(filtered, x="date", y=metric,
                       title=f"{metric.title()} over Time",
                       markers=True,
                       template="plotly_white",
@@ -170,31 +249,29 @@ with tabs[0]:
 
 with tabs[1]:
     st.header("Top N Countries & Map")
-    grouped = df.copy()
-    if len(date_range) == 2:
-        gstart, gend = pd.to_datetime(date_range[0]), pd.to_datetime(date_range[1])
-        grouped = grouped[(grouped["date"] >= gstart) & (grouped["date"] <= gend)]
-
-    top = grouped.groupby("country", as_index=False)[metric].sum().sort_values(by=metric, ascending=False).head(top_n)
-    fig_bar = px.bar(top, x="country", y=metric, text=metric,
-                     labels={"country": "Country", metric: metric.title()},
-                     title=f"Top {top_n} Countries by {metric.title()}",
-                     template="plotly_white",
-                     color_discrete_sequence=["#0072B5"])
-    fig_bar.update_traces(texttemplate='%{text:,}', textposition='outside')
-    fig_bar.update_layout(uniformtext_minsize=8, uniformtext_mode='hide', margin=dict(t=40))
-    st.plotly_chart(fig_bar, use_container_width=True)
+    top = load_top_n(cfg_path, table_name, metric, start_date, end_date, top_n)
+    if top.empty:
+        st.warning("No data available for the Top N chart.")
+    else:
+        fig_bar = px.bar(top, x="country", y=metric, text=metric,
+                         labels={"country": "Country", metric: metric.title()},
+                         title=f"Top {top_n} Countries by {metric.title()}",
+                         template="plotly_white",
+                         color_discrete_sequence=["#0072B5"])
+        fig_bar.update_traces(texttemplate='%{text:,}', textposition='outside')
+        fig_bar.update_layout(uniformtext_minsize=8, uniformtext_mode='hide', margin=dict(t=40))
+        st.plotly_chart(fig_bar, use_container_width=True)
 
     if not latlon_df.empty:
-        latest_date = df["date"].max()
-        snapshot = df[df["date"] == latest_date].groupby("country", as_index=False)[metric].sum()
+        latest_date = max_date
+        snapshot = compute_snapshot(cfg_path, table_name, metric, latest_date)
         map_df = snapshot.merge(latlon_df, on="country", how="left").dropna(subset=["Latitude", "Longitude"])
         if not map_df.empty:
             fig_map = px.scatter_geo(
                 map_df, lat="Latitude", lon="Longitude", color=metric, size=metric,
                 hover_name="country", projection="natural earth",
                 color_continuous_scale=px.colors.sequential.Blues,
-                title=f"Top {top_n} Countries by {metric.title()} on {latest_date.date()}"
+                title=f"Top {top_n} Countries by {metric.title()} on {latest_date}"
             )
             fig_map.update_layout(margin=dict(t=40, b=0, l=0, r=0))
             st.plotly_chart(fig_map, use_container_width=True)
@@ -202,36 +279,37 @@ with tabs[1]:
             st.info("Latitude/Longitude data not available for the selected countries.")
 
 with tabs[2]:
-    if data_choice == "COVID Stats":
+    summary = country_summary(cfg_path, table_name)
+    if summary.empty:
+        st.warning("No data available for the analytics summary.")
+    elif data_choice == "COVID Stats":
         st.subheader("Global Summary")
-        st.table(df.agg({"cases": "sum", "deaths": "sum", "recovered": "sum"}).to_frame().T.style.format("{:,}"))
+        st.table(summary[["cases", "deaths", "recovered"]].sum().to_frame().T.style.format("{:,}"))
 
         st.subheader("Countries with Zero Deaths")
-        zero_deaths = df.groupby("country")["deaths"].sum().reset_index()
-        zero_death_countries = zero_deaths[zero_deaths["deaths"] == 0]["country"].tolist()
+        zero_death_countries = summary.loc[summary["deaths"] == 0, "country"].tolist()
         st.write(", ".join(zero_death_countries) if zero_death_countries else "None")
 
         st.subheader("Most Critical Cases (Top 5 by Deaths)")
-        top_deaths = df.groupby("country")["deaths"].sum().reset_index().sort_values("deaths", ascending=False).head(5)
+        top_deaths = summary.nlargest(5, "deaths")[["country", "deaths"]]
         st.table(top_deaths.style.format({"deaths": "{:,}"}))
 
         st.subheader("Recovered Rate > 50%")
-        recovery = df.groupby("country").agg({"recovered": "sum", "cases": "sum"}).reset_index()
-        recovery["rate"] = (recovery["recovered"] / recovery["cases"]) * 100
-        st.table(recovery[recovery["rate"] > 50].style.format({"recovered": "{:,}", "cases": "{:,}", "rate": "{:.2f}%"}))
+        recovery = compute_recovery_rates(cfg_path)
+        st.table(recovery.style.format({"recovered": "{:,}", "cases": "{:,}", "rate": "{:.2f}%"}))
 
     else:
         st.subheader("Vaccination Summary")
-        total_vax = int(df["vaccinations"].sum())
+        total_vax = int(summary["vaccinations"].sum())
         st.metric("Total Vaccinations", f"{total_vax:,}")
 
         st.subheader("Top 5 Countries by Vaccinations")
-        top_vax = df.groupby("country")["vaccinations"].sum().reset_index().sort_values("vaccinations", ascending=False).head(5)
+        top_vax = summary.nlargest(5, "vaccinations")
         st.table(top_vax.style.format({"vaccinations": "{:,}"}))
 
 with tabs[3]:
     st.header("Raw Data")
-    st.dataframe(filtered.reset_index(drop=True))
+    st.dataframe(filtered)
     st.download_button("Download CSV", filtered.to_csv(index=False).encode(), f"{data_choice.replace(' ', '_')}.csv", "text/csv")
 
 st.markdown("""
@@ -1,34 +1,59 @@
-def transform_data(data):
-    transformed = []
-    for record in data:
-        country = record.get("country", "Unknown")
-        date = record.get("date")
-        try:
-            cases = int(record.get("cases", 0))
-        except (TypeError, ValueError):
-            cases = 0
+COVID_COLUMNS = ["country", "date", "cases", "deaths", "recovered"]
+VACCINE_COLUMNS = ["country", "date", "vaccinations"]
+# Below this many records DataFrame construction costs more than it saves
+VECTORIZE_THRESHOLD = 10000
+
+# Both transform paths coerce the same way: int() semantics for metrics (anything int() rejects is 0)
+# and a missing or None country becomes "Unknown"
+def _safe_int(value, _int=int):
+    try:
+        return _int(value)
+    except (TypeError, ValueError, OverflowError):
+        return 0
 
-        try:
-            deaths = int(record.get("deaths", 0))
-        except (TypeError, ValueError):
-            deaths = 0
+def _country(value):
+    return "Unknown" if value is None else value
 
-        try:
-            recovered = int(record.get("recovered", 0))
-        except (TypeError, ValueError):
-            recovered = 0
+def _to_columns(df, columns, numeric_columns):
+    import pandas as pd
+    df = df.reindex(columns=columns)
+    df["country"] = df["country"].astype(object).where(df["country"].notna(), "Unknown")
+    df["date"] = df["date"].astype(object).where(df["date"].notna(), None)
+    for col in numeric_columns:
+        values = df[col]
+        if pd.api.types.is_numeric_dtype(values):
+            # astype truncates floats like int(); NaN and inf map to 0 as _safe_int does
+            df[col] = values.replace([float("inf"), float("-inf")], 0).fillna(0).astype("int64")
+        else:
+            # Strings such as "3.7" must go through int() too, which to_numeric would parse instead
+            df[col] = values.map(_safe_int)
+    # tolist() hands back native Python ints, which the MySQL driver can bind
+    return [df[col].tolist() for col in columns]
 
-        transformed.append((country, date, cases, deaths, recovered))
-    return transformed
+# Transforms return one list per column rather than a tuple per row, which saves a Python object per record
+def transform_data(data):
+    if not data:
+        return [[] for _ in COVID_COLUMNS]
+    if len(data) < VECTORIZE_THRESHOLD:
+        return [[_country(r.get("country")) for r in data], [r.get("date") for r in data],
+                [_safe_int(r.get("cases", 0)) for r in data], [_safe_int(r.get("deaths", 0)) for r in data],
+                [_safe_int(r.get("recovered", 0)) for r in data]]
+    # pandas only pays for its import cost on the large-input path
+    import pandas as pd
+    df = pd.DataFrame.from_records(data)
+    return _to_columns(df, COVID_COLUMNS, ("cases", "deaths", "recovered"))
 
 def transform_vaccine_data(data):
-    transformed = []
-    for record in data:
-        try:
-            country = record[0] if isinstance(record, tuple) else record.get("country", "Unknown")
-            date = record[1] if isinstance(record, tuple) else record.get("date")
-            vaccinations = int(record[2] if isinstance(record, tuple) else record.get("vaccinations", 0))
-        except (TypeError, ValueError):
-            vaccinations = 0
-        transformed.append((country, date, vaccinations))
-    return transformed
+    if not data:
+        return [[] for _ in VACCINE_COLUMNS]
+    if len(data) < VECTORIZE_THRESHOLD:
+        if isinstance(data[0], tuple):
+            return [[_country(r[0]) for r in data], [r[1] for r in data], [_safe_int(r[2]) for r in data]]
+        return [[_country(r.get("country")) for r in data], [r.get("date") for r in data],
+                [_safe_int(r.get("vaccinations", 0)) for r in data]]
+    import pandas as pd
+    if isinstance(data[0], tuple):
+        df = pd.DataFrame.from_records(data, columns=VACCINE_COLUMNS)
+    else:
+        df = pd.DataFrame.from_records(data)
+    return _to_columns(df, VACCINE_COLUMNS, ("vaccinations",))
@@ -1,190 +1,236 @@
 import argparse
-from mysql_handler import MySQLHandler
-from api_client import APIClient
-from data_transformer import transform_data, transform_vaccine_data
-from tabulate import tabulate
-from decimal import Decimal
-
-def format_large_numbers(results):
-    formatted = []
-    for row in results:
-        formatted_row = []
-        for item in row:
-            if isinstance(item, (float, int, Decimal)):
-                formatted_row.append(f"{int(item):,}")
-            else:
-                formatted_row.append(item)
-        formatted.append(formatted_row)
-    return formatted
-
-def fetch_data(args):
-    client = APIClient()
-    db = MySQLHandler()
-    try:
-        raw_data = client.fetch_data(args.country, args.start_date, args.end_date)
-        transformed = transform_data(raw_data)
-        db.insert_data("covid_stats", transformed)
-        print(f" {len(transformed)} records inserted for {args.country}")
-    finally:
-        db.close()
+import logging
+import shlex
+import sys
 
-def query_data(args):
-    db = MySQLHandler()
-    try:
-        query_type = args.query_type
-        country = args.country
-        metric = args.metric
-        n = args.n
-
-        if query_type == "daily_trends":
-            query = f"""
-                SELECT date, {metric}
-                FROM covid_stats
-                WHERE country = %s
-                ORDER BY date
-            """
-            results = db.query(query, (country,))
-            print(tabulate(format_large_numbers(results), headers=["Date", metric.capitalize()], tablefmt="grid"))
-
-        elif query_type == "total_cases":
-            query = """
-                SELECT country, SUM(cases) AS total_cases
-                FROM covid_stats
-                GROUP BY country
-                ORDER BY total_cases DESC
-            """
-            results = db.query(query)
-            print(tabulate(format_large_numbers(results), headers=["Country", "Total Cases"], tablefmt="grid"))
-
-        elif query_type == "top_n_countries_by_metric":
-            query = f"""
-                SELECT country, SUM({metric}) AS total
-                FROM covid_stats
-                GROUP BY country
-                ORDER BY total DESC
-                LIMIT %s
-            """
-            results = db.query(query, (n,))
-            print(tabulate(format_large_numbers(results), headers=["Country", f"Total {metric.capitalize()}"], tablefmt="grid"))
-
-        else:
-            print("Invalid COVID query type.")
-    finally:
-        db.close()
+# mysql_handler, api_client, data_transformer and tabulate are imported where they are used:
+# together they take several hundred ms to load, and most subcommands need only some of them
 
-def fetch_vaccine_data(args):
-    client = APIClient()
-    db = MySQLHandler()
-    try:
-        raw_data = client.fetch_vaccine_data(args.country, args.start_date, args.end_date)
-        transformed = transform_vaccine_data(raw_data)
-        db.insert_data_vaccine("vaccination_data", transformed)
-        print(f" {len(transformed)} vaccine records inserted for {args.country}")
-    finally:
-        db.close()
+def format_large_numbers(results, _num=(int, float), _fmt="{:,}".format):
+    return [[_fmt(int(item)) if isinstance(item, _num) else item for item in row] for row in results]
 
-def query_data_vaccine(args):
-    db = MySQLHandler()
-    try:
-        query_type = args.query_type
-        country = args.country
-        n = args.n
-
-        if query_type == "daily_trends":
-            query = """
-                SELECT date, vaccinations
-                FROM vaccination_data
-                WHERE country = %s
-                ORDER BY date
-            """
-            results = db.query(query, (country,))
-            print(tabulate(format_large_numbers(results), headers=["Date", "Vaccinations"], tablefmt="grid"))
-
-        elif query_type == "total_vaccinations":
-            query = """
-                SELECT country, SUM(vaccinations) AS total_vaccinations
-                FROM vaccination_data
-                GROUP BY country
-                ORDER BY total_vaccinations DESC
-            """
-            results = db.query(query)
-            print(tabulate(format_large_numbers(results), headers=["Country", "Total Vaccinations"], tablefmt="grid"))
-
-        elif query_type == "top_n_countries_by_vaccines":
-            query = """
-                SELECT country, SUM(vaccinations) AS total_vaccinations
-                FROM vaccination_data
-                GROUP BY country
-                ORDER BY total_vaccinations DESC
-                LIMIT %s
-            """
-            results = db.query(query, (n,))
-            print(tabulate(format_large_numbers(results), headers=["Country", "Total Vaccinations"], tablefmt="grid"))
-
-        else:
-            print("Invalid vaccine query type.")
-    finally:
-        db.close()
+class Resources:
+    def __init__(self):
+        self._db = None
+        self._client = None
 
-def list_tables(_):
-    db = MySQLHandler()
-    try:
-        tables = db.list_tables()
-        print(" Available Tables:")
-        for (table,) in tables:
-            print(f" - {table}")
-    finally:
-        db.close()
+    @property
+    def db(self):
+        if self._db is None:
+            from mysql_handler import MySQLHandler
+            self._db = MySQLHandler()
+        return self._db
 
-def drop_tables(_):
-    db = MySQLHandler()
-    try:
-        tables = db.list_tables()
-        for (table,) in tables:
-            db.cursor.execute(f"DROP TABLE IF EXISTS {table}")
-        db.conn.commit()
+    @property
+    def client(self):
+        if self._client is None:
+            from api_client import APIClient
+            self._client = APIClient()
+        return self._client
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+_METRICS = ("cases", "deaths", "recovered")
+# Built once per metric so the prepared cursor is handed the same string object on every call
+_DAILY = {m: f"SELECT date, {m} FROM covid_stats WHERE country = %s ORDER BY date" for m in _METRICS}
+_TOPN = {m: f"SELECT country, FORMAT(SUM({m}), 0) AS total FROM covid_stats GROUP BY country ORDER BY SUM({m}) DESC LIMIT %s"
+         for m in _METRICS}
+_TOTAL_CASES = "SELECT country, FORMAT(SUM(cases), 0) AS total_cases FROM covid_stats GROUP BY country ORDER BY SUM(cases) DESC"
+_VACCINE_DAILY = "SELECT date, vaccinations FROM vaccination_data WHERE country = %s ORDER BY date"
+_VACCINE_TOTAL = ("SELECT country, FORMAT(SUM(vaccinations), 0) AS total_vaccinations FROM vaccination_data "
+                  "GROUP BY country ORDER BY SUM(vaccinations) DESC")
+_VACCINE_TOPN = _VACCINE_TOTAL + " LIMIT %s"
+
+# query_type -> (SQL keyed by metric, params builder, headers with {metric} placeholders, stream rows)
+_COVID_DISPATCH = {
+    "daily_trends": (_DAILY, lambda a: (a.country,), ["Date", "{metric}"], True),
+    "total_cases": (dict.fromkeys(_METRICS, _TOTAL_CASES), lambda a: (), ["Country", "Total Cases"], False),
+    "top_n_countries_by_metric": (_TOPN, lambda a: (a.n,), ["Country", "Total {metric}"], False),
+}
+_VACCINE_DISPATCH = {
+    "daily_trends": (_VACCINE_DAILY, lambda a: (a.country,), ["Date", "Vaccinations"], True),
+    "total_vaccinations": (_VACCINE_TOTAL, lambda a: (), ["Country", "Total Vaccinations"], False),
+    "top_n_countries_by_vaccines": (_VACCINE_TOPN, lambda a: (a.n,), ["Country", "Total Vaccinations"], False),
+}
+
+FAST_TABLE_ROWS = 1000
+
+def fast_table(rows, headers):
+    # Single pass over the rows for widths; tabulate's grid padding gets slow on long result sets
+    widths = [max(len(h), *(len(str(r[i])) for r in rows)) for i, h in enumerate(headers)]
+    lines = [" ".join(h.ljust(w) for h, w in zip(headers, widths)), " ".join("-" * w for w in widths)]
+    lines.extend(" ".join(str(c).ljust(w) for c, w in zip(r, widths)) for r in rows)
+    return "\n".join(lines)
+
+def print_table(rows, headers):
+    if len(rows) > FAST_TABLE_ROWS:
+        print(fast_table(rows, headers))
+    else:
+        from tabulate import tabulate
+        print(tabulate(rows, headers=headers, tablefmt="grid"))
+
+def parse_countries(value):
+    return [country.strip() for country in value.split(",") if country.strip()]
+
+def transform_and_insert(raw_data, transform, insert, chunk_size=None):
+    from mysql_handler import LOAD_DATA_THRESHOLD
+    chunk_size = chunk_size or LOAD_DATA_THRESHOLD
+    if len(raw_data) <= chunk_size:
+        return insert(transform(raw_data))
+    from concurrent.futures import ThreadPoolExecutor
+    # Transform the next chunk while the previous one is being inserted; one insert in flight bounds memory.
+    # insert returns the rows it actually stored (0 for a rolled-back chunk), so only those are counted
+    total = 0
+    pending = None
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        for i in range(0, len(raw_data), chunk_size):
+            transformed = transform(raw_data[i:i + chunk_size])
+            if pending is not None:
+                total += pending.result()
+            pending = pool.submit(insert, transformed)
+        total += pending.result()
+    return total
+
+def fetch_data(args, res):
+    from data_transformer import transform_data
+    countries = parse_countries(args.country)
+    if not countries:
+        print(" No country given.")
+        return
+    client, db = res.client, res.db
+    if args.no_cache:
+        client.clear_cache()
+    if len(countries) == 1 and countries[0].lower() == "all":
+        raw_data = client.fetch_all(args.start_date, args.end_date)
+    elif len(countries) > 1:
+        import asyncio
+        raw_data = asyncio.run(client.fetch_many(countries, args.start_date, args.end_date))
+    else:
+        raw_data = client.fetch_data(countries[0], args.start_date, args.end_date)
+    count = transform_and_insert(raw_data, transform_data, lambda rows: db.insert_data("covid_stats", rows))
+    print(f" {count} records inserted for {', '.join(countries)}")
+
+def query_data(args, res):
+    metric = args.metric
+    if metric not in _METRICS:
+        raise ValueError(f"Unsupported metric '{metric}', expected one of: {', '.join(_METRICS)}")
+    entry = _COVID_DISPATCH.get(args.query_type)
+    if entry is None:
+        print("Invalid COVID query type.")
+        return
+    queries, params, headers, stream = entry
+    results = res.db.query(queries[metric], params(args), stream=stream)
+    print_table(format_large_numbers(results), [h.format(metric=metric.capitalize()) for h in headers])
+
+def fetch_vaccine_data(args, res):
+    from data_transformer import transform_vaccine_data
+    countries = parse_countries(args.country)
+    if not countries:
+        print(" No country given.")
+        return
+    client, db = res.client, res.db
+    if args.no_cache:
+        client.clear_cache()
+    if len(countries) > 1:
+        import asyncio
+        raw_data = asyncio.run(client.fetch_many_vaccine(countries, args.start_date, args.end_date))
+    else:
+        raw_data = client.fetch_vaccine_data(countries[0], args.start_date, args.end_date)
+    count = transform_and_insert(raw_data, transform_vaccine_data, lambda rows: db.insert_data_vaccine("vaccination_data", rows))
+    print(f" {count} vaccine records inserted for {', '.join(countries)}")
+
+def query_data_vaccine(args, res):
+    entry = _VACCINE_DISPATCH.get(args.query_type)
+    if entry is None:
+        print("Invalid vaccine query type.")
+        return
+    query, params, headers, stream = entry
+    results = res.db.query(query, params(args), stream=stream)
+    print_table(format_large_numbers(results), headers)
+
+def list_tables(_, res):
+    db = res.db
+    tables = db.list_tables()
+    print(" Available Tables:")
+    for (table,) in tables:
+        print(f" - {table}")
+
+def drop_tables(_, res):
+    db = res.db
+    if db.drop_tables([table for (table,) in db.list_tables()]):
         print(" All tables dropped.")
-    finally:
-        db.close()
 
-def drop_table(args):
-    db = MySQLHandler()
-    try:
-        db.cursor.execute(f"DROP TABLE IF EXISTS {args.table}")
-        db.conn.commit()
+def drop_table(args, res):
+    db = res.db
+    if db.drop_tables([args.table]):
         print(f"Table '{args.table}' dropped successfully.")
+
+def run_batch(args, res):
+    if args.file == "-":
+        main_batch(sys.stdin, res)
+    else:
+        with open(args.file) as f:
+            main_batch(f, res)
+
+def configure_logging():
+    # Set up the root logger before any handler logs, so a DB command cannot lock it at WARNING
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+def main_batch(commands, res=None):
+    configure_logging()
+    parser = build_parser()
+    owns_resources = res is None
+    res = res or Resources()
+    try:
+        for line in commands:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                args = parser.parse_args(shlex.split(line))
+            except SystemExit:
+                continue
+            if args.func is run_batch:
+                print(f" Skipping nested batch command: {line}")
+                continue
+            args.func(args, res)
     finally:
-        db.close()
+        if owns_resources:
+            res.close()
 
-def main():
+def build_parser():
     parser = argparse.ArgumentParser(description=" Global Healthcare Data ETL & CLI Analysis Tool")
     subparsers = parser.add_subparsers(dest="command", required=True)
 
     fetch_parser = subparsers.add_parser("fetch_data", help="Fetch and store COVID data for a country")
-    fetch_parser.add_argument("country", help="Country name")
+    fetch_parser.add_argument("country", help="Country name, a comma-separated list of countries, or 'all'")
     fetch_parser.add_argument("start_date", help="Start date in YYYY-MM-DD")
     fetch_parser.add_argument("end_date", help="End date in YYYY-MM-DD")
+    fetch_parser.add_argument("--no-cache", action="store_true", help="Clear cached API responses before fetching")
     fetch_parser.set_defaults(func=fetch_data)
 
     query_parser = subparsers.add_parser("query_data", help="Query the COVID database")
-    query_parser.add_argument("query_type", choices=[
-        "total_cases", "daily_trends", "top_n_countries_by_metric"
-    ])
+    query_parser.add_argument("query_type", choices=list(_COVID_DISPATCH))
     query_parser.add_argument("--country", help="Country name", default=None)
-    query_parser.add_argument("--metric", help="Metric: cases, deaths, recovered", default="cases")
+    query_parser.add_argument("--metric", choices=_METRICS, help="Metric: cases, deaths, recovered", default="cases")
     query_parser.add_argument("--n", type=int, help="Number of top countries")
     query_parser.set_defaults(func=query_data)
 
     vaccine_fetch_parser = subparsers.add_parser("fetch_vaccine_data", help="Fetch and store vaccination data")
-    vaccine_fetch_parser.add_argument("country", help="Country name")
+    vaccine_fetch_parser.add_argument("country", help="Country name, or a comma-separated list of countries")
     vaccine_fetch_parser.add_argument("start_date", help="Start date in YYYY-MM-DD")
     vaccine_fetch_parser.add_argument("end_date", help="End date in YYYY-MM-DD")
+    vaccine_fetch_parser.add_argument("--no-cache", action="store_true", help="Clear cached API responses before fetching")
     vaccine_fetch_parser.set_defaults(func=fetch_vaccine_data)
 
     vaccine_query_parser = subparsers.add_parser("query_data_vaccine", help="Query the vaccination database")
-    vaccine_query_parser.add_argument("query_type", choices=[
-        "daily_trends", "total_vaccinations", "top_n_countries_by_vaccines"
-    ])
+    vaccine_query_parser.add_argument("query_type", choices=list(_VACCINE_DISPATCH))
     vaccine_query_parser.add_argument("--country", help="Country name", default=None)
     vaccine_query_parser.add_argument("--n", type=int, help="Number of top countries")
     vaccine_query_parser.set_defaults(func=query_data_vaccine)
@@ -199,8 +245,20 @@ def main():
     drop_one_parser.add_argument("table", help="Table name")
     drop_one_parser.set_defaults(func=drop_table)
 
-    args = parser.parse_args()
-    args.func(args)
+    batch_parser = subparsers.add_parser("batch", help="Run several commands over one database connection")
+    batch_parser.add_argument("file", help="File with one command per line, or '-' to read from stdin")
+    batch_parser.set_defaults(func=run_batch)
+
+    return parser
+
+def main():
+    configure_logging()
+    args = build_parser().parse_args()
+    res = Resources()
+    try:
+        args.func(args, res)
+    finally:
+        res.close()
 
 if __name__ == "__main__":
     main()
@@ -1,19 +1,87 @@
 import mysql.connector
+from mysql.connector import pooling
 import configparser
+import csv
+import dbm
+import hashlib
 import logging
+import os
+import shelve
+import tempfile
+import time
+
+BATCH_SIZE = 10000
+LOAD_DATA_THRESHOLD = 50000
+POOL_SIZE = 1
+QUERY_CACHE_PATH = "query_cache"
+QUERY_CACHE_TTL = 300
+_CACHE_VERSION_KEY = "__version__"
+
+def _load_cfg():
+    config = configparser.ConfigParser()
+    config.read('config.ini')
+    cfg = {key: config['mysql'][key] for key in ("host", "user", "password", "database")}
+    # MYSQL_HOST, MYSQL_USER, ... override config.ini without editing the file
+    for key in cfg:
+        cfg[key] = os.environ.get(f"MYSQL_{key.upper()}", cfg[key])
+    return cfg
+
+_MYSQL = _load_cfg()
+_pool = None
+# Log through a module logger: root-level logging calls would implicitly run basicConfig() at WARNING
+# and silence the INFO logs of anything that configures logging later
+logger = logging.getLogger(__name__)
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        if not mysql.connector.HAVE_CEXT:
+            logger.warning(" mysql-connector C extension not available, falling back to the slower pure-Python protocol")
+        _pool = pooling.MySQLConnectionPool(
+            pool_name="healthcare_etl",
+            pool_size=POOL_SIZE,
+            autocommit=False,
+            # LOAD DATA LOCAL may only read the temp CSVs written by _load_data, not arbitrary client files
+            allow_local_infile_in_path=tempfile.gettempdir(),
+            **_MYSQL
+        )
+    return _pool
+
+def _cache_get(key):
+    try:
+        with shelve.open(QUERY_CACHE_PATH) as cache:
+            entry = cache.get(key)
+            if entry and entry[0] == cache.get(_CACHE_VERSION_KEY, 0) and time.time() - entry[1] < QUERY_CACHE_TTL:
+                return entry[2]
+    except (dbm.error, OSError) as err:
+        logger.warning(f" Query cache unavailable: {err}")
+    return None
+
+def _cache_put(key, rows):
+    try:
+        with shelve.open(QUERY_CACHE_PATH) as cache:
+            cache[key] = (cache.get(_CACHE_VERSION_KEY, 0), time.time(), rows)
+    except (dbm.error, OSError) as err:
+        logger.warning(f" Query cache unavailable: {err}")
+
+def _invalidate_cache():
+    # Entries stamped with an older version are ignored, so one write invalidates everything cached
+    try:
+        with shelve.open(QUERY_CACHE_PATH) as cache:
+            cache[_CACHE_VERSION_KEY] = cache.get(_CACHE_VERSION_KEY, 0) + 1
+    except (dbm.error, OSError) as err:
+        logger.warning(f" Query cache unavailable: {err}")
 
 class MySQLHandler:
     def __init__(self):
-        config = configparser.ConfigParser()
-        config.read('config.ini')
-        self.conn = mysql.connector.connect(
-            host=config['mysql']['host'],
-            user=config['mysql']['user'],
-            password=config['mysql']['password'],
-            database=config['mysql']['database']
-        )
-        self.cursor = self.conn.cursor()
-        logging.info("Connected to MySQL database")
+        self.conn = _get_pool().get_connection()
+        # Reads and DDL/writes use separate cursors so a failed statement on one cannot leave unread rows on the other
+        self._read_cursor = self.conn.cursor(buffered=True)
+        self._ddl_cursor = self.conn.cursor()
+        self.prep_cursor = self.conn.cursor(prepared=True)
+        # Prepared cursors fetch rows lazily, so a second long-lived one serves streamed reads and keeps its statement
+        self._stream_cursor = self.conn.cursor(prepared=True)
+        logger.info("Connected to MySQL database")
 
     def create_tables(self):
         try:
@@ -21,56 +89,143 @@ class MySQLHandler:
                 sql_script = f.read()
                 for statement in sql_script.strip().split(';'):
                     if statement.strip():
-                        self.cursor.execute(statement)
+                        self._ddl_cursor.execute(statement)
             self.conn.commit()
-            logging.info(" Tables created successfully")
+            _invalidate_cache()
+            logger.info(" Tables created successfully")
         except Exception as e:
-            logging.error(f"Failed to create tables: {e}")
+            logger.error(f"Failed to create tables: {e}")
 
-    def insert_data(self, table_name, data):
-        query = f"""
-        INSERT IGNORE INTO {table_name} (country, date, cases, deaths, recovered)
-        VALUES (%s, %s, %s, %s, %s)
-        """
+    def insert_data(self, table_name, data, batch_size=BATCH_SIZE):
         try:
-            self.cursor.executemany(query, data)
+            inserted = self._bulk_insert(table_name, ("country", "date", "cases", "deaths", "recovered"), data, batch_size)
             self.conn.commit()
-            logging.info(f" Inserted {self.cursor.rowcount} records into {table_name}")
+            _invalidate_cache()
+            logger.info(f" Inserted {inserted} records into {table_name}")
+            return inserted
         except mysql.connector.Error as err:
-            logging.error(f" Error inserting data: {err}")
+            logger.error(f" Error inserting data: {err}")
             self.conn.rollback()
+            return 0
+
+    def _bulk_insert(self, table_name, columns, data, batch_size):
+        # data holds one list per column
+        count = len(data[0])
+        if count >= LOAD_DATA_THRESHOLD:
+            try:
+                return self._load_data(table_name, columns, data)
+            except mysql.connector.Error as err:
+                logger.warning(f" LOAD DATA unavailable, falling back to batched INSERTs: {err}")
+
+        placeholder = "(" + ", ".join(["%s"] * len(columns)) + ")"
+        prefix = f"INSERT IGNORE INTO {table_name} ({', '.join(columns)}) VALUES "
+        width = len(columns)
+        inserted = 0
+        for i in range(0, count, batch_size):
+            rows = min(batch_size, count - i)
+            # Interleave the columns into the flat VALUES parameter list with slice assignment, no per-row tuples
+            params = [None] * (rows * width)
+            for j, column in enumerate(data):
+                params[j::width] = column[i:i + rows]
+            self._ddl_cursor.execute(prefix + ",".join([placeholder] * rows), params)
+            inserted += self._ddl_cursor.rowcount
+        return inserted
+
+    def _load_data(self, table_name, columns, data):
+        # Load into a temporary copy of the table, then INSERT IGNORE to keep duplicate-skipping semantics
+        col_list = ", ".join(columns)
+        tmp_table = f"tmp_{table_name}"
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", newline="", delete=False) as f:
+            csv.writer(f, lineterminator="\n").writerows(zip(*data))
+            path = f.name
+        try:
+            self._ddl_cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS {tmp_table}")
+            self._ddl_cursor.execute(f"CREATE TEMPORARY TABLE {tmp_table} LIKE {table_name}")
+            self._ddl_cursor.execute(f"""
+            LOAD DATA LOCAL INFILE %s INTO TABLE {tmp_table}
+            FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '"' ESCAPED BY ''
+            LINES TERMINATED BY '\\n' ({col_list})
+            """, (path,))
+            self._ddl_cursor.execute(f"INSERT IGNORE INTO {table_name} ({col_list}) SELECT {col_list} FROM {tmp_table}")
+            inserted = self._ddl_cursor.rowcount
+            self._ddl_cursor.execute(f"DROP TEMPORARY TABLE {tmp_table}")
+            return inserted
+        finally:
+            os.remove(path)
 
     def list_tables(self):
         try:
-            self.cursor.execute("SHOW TABLES")
-            return self.cursor.fetchall()
+            self._ddl_cursor.execute("SHOW TABLES")
+            return self._ddl_cursor.fetchall()
         except mysql.connector.Error as err:
-            logging.error(f" Failed to list tables: {err}")
+            logger.error(f" Failed to list tables: {err}")
             return []
 
-    def query(self, query, params=None):
+    def drop_tables(self, tables):
+        if not tables:
+            return True
+        names = ["`" + table.replace("`", "``") + "`" for table in tables]
+        try:
+            self._ddl_cursor.execute("DROP TABLE IF EXISTS " + ", ".join(names))
+            self.conn.commit()
+        except mysql.connector.Error as err:
+            logger.error(f" Failed to drop tables: {err}")
+            return False
+        _invalidate_cache()
+        return True
+
+    def query(self, query, params=None, stream=False):
+        if stream:
+            return self._stream(query, params)
+        # Include the target server and schema so MYSQL_* overrides never read another database's results
+        target = (_MYSQL["host"], _MYSQL["user"], _MYSQL["database"])
+        key = hashlib.blake2b((repr(target) + query + repr(params)).encode()).hexdigest()
+        rows = _cache_get(key)
+        if rows is not None:
+            return rows
+        # Parameterized SELECTs reuse the server-side statement while the same query string is executed again
+        cursor = self.prep_cursor if params else self._read_cursor
         try:
-            self.cursor.execute(query, params or ())
-            return self.cursor.fetchall()
+            cursor.execute(query, params or ())
+            rows = cursor.fetchall()
+            _cache_put(key, rows)
+            return rows
         except mysql.connector.Error as err:
-            logging.error(f" Query execution failed: {err}")
+            logger.error(f" Query execution failed: {err}")
             return []
 
+    def _stream(self, query, params, size=4096):
+        cursor = self._stream_cursor
+        try:
+            cursor.execute(query, params or ())
+            while rows := cursor.fetchmany(size):
+                yield from rows
+        except mysql.connector.Error as err:
+            logger.error(f" Query execution failed: {err}")
+        finally:
+            # Drain rows left by an abandoned iteration so the connection can run the next statement
+            try:
+                cursor.fetchall()
+            except mysql.connector.Error:
+                pass
+
     def close(self):
         if self.conn.is_connected():
-            self.cursor.close()
+            self._read_cursor.close()
+            self._ddl_cursor.close()
+            self.prep_cursor.close()
+            self._stream_cursor.close()
             self.conn.close()
-            logging.info(" MySQL connection closed")
-            
-    def insert_data_vaccine(self, table_name, data):
-        query = f"""
-        INSERT IGNORE INTO {table_name} (country, date, vaccinations)
-        VALUES (%s, %s, %s)
-        """
+            logger.info(" MySQL connection returned to pool")
+
+    def insert_data_vaccine(self, table_name, data, batch_size=BATCH_SIZE):
         try:
-            self.cursor.executemany(query, data)
+            inserted = self._bulk_insert(table_name, ("country", "date", "vaccinations"), data, batch_size)
             self.conn.commit()
-            logging.info(f" Inserted {self.cursor.rowcount} vaccination records into {table_name}")
+            _invalidate_cache()
+            logger.info(f" Inserted {inserted} vaccination records into {table_name}")
+            return inserted
         except mysql.connector.Error as err:
-            logging.error(f" Error inserting vaccination data: {err}")
+            logger.error(f" Error inserting vaccination data: {err}")
             self.conn.rollback()
+            return 0
@@ -6,7 +6,8 @@ CREATE TABLE IF NOT EXISTS covid_stats (
     deaths INT,
     recovered INT,
     last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    UNIQUE (country, date)
+    UNIQUE (country, date),
+    INDEX idx_country_metrics (country, date, cases, deaths, recovered)
 );
 CREATE TABLE IF NOT EXISTS vaccination_data (
     id INT AUTO_INCREMENT PRIMARY KEY,
@@ -14,5 +15,6 @@ CREATE TABLE IF NOT EXISTS vaccination_data (
     date DATE NOT NULL,
     vaccinations BIGINT,
     last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    UNIQUE (country, date)
+    UNIQUE (country, date),
+    INDEX idx_country_vaccinations (country, date, vaccinations)
 );